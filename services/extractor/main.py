@@ -1,15 +1,21 @@
 """Extractor service - Claim extraction using local LLM."""
 import os
-import json
+import asyncio
+import functools
+import threading
 import time
-import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Iterator, Optional
+import ijson
+import msgspec
 import structlog
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
-from pydantic import ValidationError
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
 import ollama
 
-from .models import Claim, ExtractionRequest, ExtractionResponse
+from .models import Claim, ExtractionRequest, ExtractionResponse, RawClaim
 from .prompts import build_extraction_prompt
 
 # Configure structured logging
@@ -23,15 +29,44 @@ structlog.configure(
 
 logger = structlog.get_logger()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the extraction thread pool; shut it down on exit."""
+    # Sized to the semaphore; the default executor has min(32, cpus + 4)
+    # threads and would otherwise be the real concurrency limit
+    app.state.extraction_executor = ThreadPoolExecutor(
+        max_workers=MAX_CONCURRENT_EXTRACTIONS,
+        thread_name_prefix="extractor-llm"
+    )
+
+    yield
+
+    app.state.extraction_executor.shutdown(wait=True)
+
+
 app = FastAPI(
     title="Prompt Analyzer - Extractor Service",
     description="Semantic claim extraction from instructions",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Ollama configuration
 OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://ollama:11434")
-MODEL = os.getenv("MODEL", "llama3.1:8b")
+MODEL = os.getenv("MODEL", "llama3.1:8b-instruct-q4_K_M")
+# Should match the Ollama server's OLLAMA_NUM_PARALLEL so it can batch requests
+MAX_CONCURRENT_EXTRACTIONS = int(os.getenv("MAX_CONCURRENT_EXTRACTIONS", "16"))
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "4096"))
+# Claim JSON is short, so cap generation and keep the KV cache small
+NUM_CTX = int(os.getenv("NUM_CTX", "2048"))
+NUM_PREDICT = int(os.getenv("NUM_PREDICT", "512"))
+LLM_OPTIONS = {
+    "temperature": 0.0,
+    "top_k": 1,
+    "num_ctx": NUM_CTX,
+    "num_predict": NUM_PREDICT,
+}
 
 # Initialize Ollama client
 try:
@@ -41,10 +76,94 @@ except Exception as e:
     logger.error("ollama_client_init_failed", error=str(e))
     ollama_client = None
 
+extraction_semaphore = asyncio.Semaphore(MAX_CONCURRENT_EXTRACTIONS)
+
+# LLMs sometimes return a single object instead of an array, and often quote
+# numbers; strict=False coerces those the way Pydantic's lax mode did
+raw_claims_decoder = msgspec.json.Decoder(list[RawClaim] | RawClaim, strict=False)
+
+
+class _IdGenerator:
+    """Short random hex IDs sliced from bulk urandom reads, one buffer per thread."""
+
+    ID_BYTES = 6
+    BUFFER_SIZE = 4096
+
+    def __init__(self, prefix: str):
+        self._prefix = prefix
+        self._local = threading.local()
+
+    def next(self) -> str:
+        local = self._local
+        pos = getattr(local, "pos", self.BUFFER_SIZE)
+        if pos + self.ID_BYTES > self.BUFFER_SIZE:
+            local.buf = os.urandom(self.BUFFER_SIZE)
+            pos = 0
+        local.pos = pos + self.ID_BYTES
+        return self._prefix + local.buf[pos:pos + self.ID_BYTES].hex()
+
+
+_claim_ids = _IdGenerator("clm_")
+
 
 def generate_claim_id() -> str:
     """Generate unique claim ID."""
-    return f"clm_{uuid.uuid4().hex[:12]}"
+    return _claim_ids.next()
+
+
+def validate_raw_claims(raw_claims) -> list[RawClaim]:
+    """Validate decoded LLM output item by item, skipping invalid claims."""
+    # Handle case where LLM returns object instead of array
+    if isinstance(raw_claims, dict):
+        raw_claims = [raw_claims]
+
+    if not isinstance(raw_claims, list):
+        logger.warning("invalid_llm_output_type", type=type(raw_claims).__name__)
+        return []
+
+    validated = []
+    for i, raw in enumerate(raw_claims):
+        try:
+            validated.append(msgspec.convert(raw, RawClaim, strict=False))
+        except msgspec.ValidationError as e:
+            logger.warning(
+                "invalid_claim",
+                claim_index=i,
+                error=str(e),
+                raw_claim=raw
+            )
+    return validated
+
+
+@functools.lru_cache(maxsize=LLM_CACHE_SIZE)
+def generate_llm_output(text: str, model: str) -> str:
+    """Run the extraction prompt through the LLM, cached on exact (text, model)."""
+    response = ollama_client.generate(
+        model=model,
+        prompt=build_extraction_prompt(text),
+        format="json",
+        options=LLM_OPTIONS
+    )
+    return response['response']
+
+
+def build_claim(event_id: str, session_id: str, raw: RawClaim, index: int) -> Optional[Claim]:
+    """Turn a validated LLM claim into a Claim, or None if it has no evidence."""
+    if not raw.evidence:
+        logger.warning(
+            "invalid_claim",
+            claim_index=index,
+            error="Evidence must contain at least one quote"
+        )
+        return None
+
+    # Fields were validated by msgspec, so skip Pydantic validation
+    return Claim.model_construct(
+        claim_id=generate_claim_id(),
+        session_id=session_id,
+        event_id=event_id,
+        **msgspec.structs.asdict(raw)
+    )
 
 
 def extract_claims_from_text(event_id: str, session_id: str, text: str) -> list[Claim]:
@@ -53,17 +172,11 @@ def extract_claims_from_text(event_id: str, session_id: str, text: str) -> list[
         logger.error("ollama_client_not_available")
         return []
 
-    prompt = build_extraction_prompt(text)
-
     try:
         start_time = time.time()
 
-        response = ollama_client.generate(
-            model=MODEL,
-            prompt=prompt,
-            format="json",
-            options={"temperature": 0.0}
-        )
+        # Claim IDs are assigned below, so cached output is safe to reuse
+        output = generate_llm_output(text, MODEL)
 
         duration_ms = (time.time() - start_time) * 1000
 
@@ -71,44 +184,25 @@ def extract_claims_from_text(event_id: str, session_id: str, text: str) -> list[
             "llm_response_received",
             event_id=event_id,
             duration_ms=duration_ms,
-            response_length=len(response['response'])
+            response_length=len(output)
         )
 
-        # Parse LLM output
+        # Parse and validate LLM output in one pass
         try:
-            raw_claims = json.loads(response['response'])
-
-            # Handle case where LLM returns object instead of array
-            if isinstance(raw_claims, dict):
-                raw_claims = [raw_claims]
-
-            if not isinstance(raw_claims, list):
-                logger.warning("invalid_llm_output_type", type=type(raw_claims).__name__)
-                return []
-
-        except json.JSONDecodeError as e:
-            logger.error("llm_output_parse_failed", error=str(e), output=response['response'][:200])
+            decoded = raw_claims_decoder.decode(output)
+            raw_claims = decoded if isinstance(decoded, list) else [decoded]
+        except msgspec.ValidationError:
+            # At least one item is invalid - fall back to per-item validation
+            raw_claims = validate_raw_claims(msgspec.json.decode(output))
+        except msgspec.DecodeError as e:
+            logger.error("llm_output_parse_failed", error=str(e), output=output[:200])
             return []
 
-        # Validate with Pydantic
         validated_claims = []
         for i, raw in enumerate(raw_claims):
-            try:
-                claim = Claim(
-                    claim_id=generate_claim_id(),
-                    session_id=session_id,
-                    event_id=event_id,
-                    **raw
-                )
+            claim = build_claim(event_id, session_id, raw, i)
+            if claim is not None:
                 validated_claims.append(claim)
-            except ValidationError as e:
-                logger.warning(
-                    "invalid_claim",
-                    claim_index=i,
-                    error=str(e),
-                    raw_claim=raw
-                )
-                continue
 
         logger.info(
             "claims_extracted",
@@ -124,54 +218,133 @@ def extract_claims_from_text(event_id: str, session_id: str, text: str) -> list[
         return []
 
 
-@app.post("/extract", response_model=ExtractionResponse)
-async def extract_claims(request: ExtractionRequest):
-    """Extract semantic claims from instruction text."""
+def stream_claims_from_text(event_id: str, session_id: str, text: str) -> Iterator[Claim]:
+    """Extract claims using a streamed LLM response, yielding each as soon as it is parsed."""
+    if not ollama_client:
+        logger.error("ollama_client_not_available")
+        return
+
+    start_time = time.time()
+    chunks = []
+    items = ijson.sendable_list()
+    parser = ijson.items_coro(items, "item", use_float=True)
+    claim_count = 0
+    index = 0
+
     try:
+        stream = ollama_client.generate(
+            model=MODEL,
+            prompt=build_extraction_prompt(text),
+            format="json",
+            options=LLM_OPTIONS,
+            stream=True
+        )
+
+        for chunk in stream:
+            chunks.append(chunk['response'])
+            parser.send(chunk['response'].encode())
+
+            # Array elements that closed in this chunk
+            for item in items:
+                try:
+                    raw = msgspec.convert(item, RawClaim, strict=False)
+                except msgspec.ValidationError as e:
+                    logger.warning("invalid_claim", claim_index=index, error=str(e), raw_claim=item)
+                    raw = None
+
+                claim = build_claim(event_id, session_id, raw, index) if raw else None
+                index += 1
+                if claim is not None:
+                    claim_count += 1
+                    yield claim
+            del items[:]
+
+        parser.close()
+
+        # LLM returned a single object instead of an array
+        if index == 0:
+            output = "".join(chunks)
+            try:
+                raw_claims = validate_raw_claims(msgspec.json.decode(output))
+            except msgspec.DecodeError as e:
+                logger.error("llm_output_parse_failed", error=str(e), output=output[:200])
+                return
+
+            for i, raw in enumerate(raw_claims):
+                claim = build_claim(event_id, session_id, raw, i)
+                if claim is not None:
+                    claim_count += 1
+                    yield claim
+
+    except ijson.JSONError as e:
+        logger.error("llm_output_parse_failed", error=str(e), output="".join(chunks)[:200])
+    except Exception as e:
+        logger.error("extraction_failed", event_id=event_id, error=str(e))
+
+    logger.info(
+        "claims_extracted",
+        event_id=event_id,
+        claim_count=claim_count,
+        duration_ms=(time.time() - start_time) * 1000
+    )
+
+
+async def run_extraction(request: ExtractionRequest) -> ExtractionResponse:
+    """Run a blocking extraction in a worker thread, bounded by the semaphore."""
+    async with extraction_semaphore:
         start_time = time.time()
 
-        claims = extract_claims_from_text(
-            event_id=request.event_id,
-            session_id=request.session_id,
-            text=request.text
+        loop = asyncio.get_running_loop()
+        claims = await loop.run_in_executor(
+            app.state.extraction_executor,
+            extract_claims_from_text,
+            request.event_id,
+            request.session_id,
+            request.text
         )
 
         extraction_time_ms = (time.time() - start_time) * 1000
 
-        return ExtractionResponse(
-            event_id=request.event_id,
-            claims=claims,
-            extraction_time_ms=extraction_time_ms
-        )
+    return ExtractionResponse(
+        event_id=request.event_id,
+        claims=claims,
+        extraction_time_ms=extraction_time_ms
+    )
+
+
+@app.post("/extract", response_model=ExtractionResponse)
+async def extract_claims(request: ExtractionRequest):
+    """Extract semantic claims from instruction text."""
+    try:
+        return await run_extraction(request)
 
     except Exception as e:
         logger.error("extract_endpoint_failed", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/extract/batch", response_model=list[ExtractionResponse])
-async def extract_batch(requests: list[ExtractionRequest]):
-    """Extract claims from multiple events."""
-    try:
-        results = []
-        for request in requests:
-            start_time = time.time()
-
-            claims = extract_claims_from_text(
+@app.post("/extract/stream")
+async def extract_claims_stream(request: ExtractionRequest):
+    """Stream extracted claims as NDJSON, one claim per line as it is parsed."""
+    async def ndjson_lines():
+        async with extraction_semaphore:
+            claims = stream_claims_from_text(
                 event_id=request.event_id,
                 session_id=request.session_id,
                 text=request.text
             )
+            async for claim in iterate_in_threadpool(claims):
+                yield claim.model_dump_json() + "\n"
 
-            extraction_time_ms = (time.time() - start_time) * 1000
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
 
-            results.append(ExtractionResponse(
-                event_id=request.event_id,
-                claims=claims,
-                extraction_time_ms=extraction_time_ms
-            ))
 
-        return results
+@app.post("/extract/batch", response_model=list[ExtractionResponse])
+async def extract_batch(requests: list[ExtractionRequest]):
+    """Extract claims from multiple events."""
+    try:
+        # Issue requests concurrently so Ollama can batch them
+        return await asyncio.gather(*(run_extraction(r) for r in requests))
 
     except Exception as e:
         logger.error("batch_extract_failed", error=str(e))
@@ -198,7 +371,8 @@ def health():
             "service": "extractor",
             "ollama_host": OLLAMA_HOST,
             "model": MODEL,
-            "ollama_status": ollama_status
+            "ollama_status": ollama_status,
+            "llm_cache": generate_llm_output.cache_info()._asdict()
         }
 
     except Exception as e:
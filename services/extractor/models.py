@@ -1,6 +1,7 @@
 """Data models for extractor service."""
+import msgspec
 from pydantic import BaseModel, Field, validator
-from typing import Literal
+from typing import Annotated, Literal
 
 
 class Claim(BaseModel):
@@ -41,6 +42,21 @@ class Claim(BaseModel):
         }
 
 
+class RawClaim(msgspec.Struct, frozen=True, gc=False):
+    """Claim fields as emitted by the LLM, before IDs are assigned.
+
+    Only holds strings, floats and lists of strings, so it can never be part
+    of a reference cycle and is safe to exclude from GC tracking.
+    """
+    modality: Literal["must", "must_not", "should", "prefer", "avoid", "allowed"]
+    action: str
+    target: str
+    confidence: Annotated[float, msgspec.Meta(ge=0.0, le=1.0)]
+    evidence: list[str]
+    conditions: list[str] = []
+    exceptions: list[str] = []
+
+
 class ExtractionRequest(BaseModel):
     """Request model for claim extraction."""
     event_id: str
@@ -3,9 +3,9 @@ import os
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
-import uuid
+import threading
 import structlog
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.responses import JSONResponse
 from sse_starlette.sse import EventSourceResponse
 import asyncio
@@ -35,25 +35,51 @@ data_dir = Path(os.getenv("DATA_DIR", "/data/ledger"))
 storage = LedgerStorage(data_dir)
 
 # For SSE streaming
-event_subscribers = []
+event_subscribers: set[asyncio.Queue] = set()
+SUBSCRIBER_QUEUE_SIZE = 1024
+
+
+class _IdGenerator:
+    """Short random hex IDs sliced from bulk urandom reads, one buffer per thread."""
+
+    ID_BYTES = 6
+    BUFFER_SIZE = 4096
+
+    def __init__(self, prefix: str):
+        self._prefix = prefix
+        self._local = threading.local()
+
+    def next(self) -> str:
+        local = self._local
+        pos = getattr(local, "pos", self.BUFFER_SIZE)
+        if pos + self.ID_BYTES > self.BUFFER_SIZE:
+            local.buf = os.urandom(self.BUFFER_SIZE)
+            pos = 0
+        local.pos = pos + self.ID_BYTES
+        return self._prefix + local.buf[pos:pos + self.ID_BYTES].hex()
+
+
+_event_ids = _IdGenerator("evt_")
 
 
 def generate_id() -> str:
     """Generate unique event ID."""
-    return f"evt_{uuid.uuid4().hex[:12]}"
+    return _event_ids.next()
 
 
 @app.post("/ledger/append", response_model=Event)
 async def append_event(event_data: EventCreate):
     """Append new instruction event to ledger."""
     try:
-        event = Event(
+        # EventCreate is already validated, so skip re-validation
+        event = Event.model_construct(
             event_id=generate_id(),
             ts=datetime.now(),
-            **event_data.model_dump()
+            **dict(event_data)
         )
 
-        storage.append_event(event)
+        # Subscribers are only notified once the event is on disk
+        await asyncio.wrap_future(storage.submit_event(event))
 
         logger.info(
             "event_appended",
@@ -63,9 +89,14 @@ async def append_event(event_data: EventCreate):
             text_length=len(event.text)
         )
 
-        # Notify SSE subscribers
-        for queue in event_subscribers:
-            await queue.put(event)
+        # Notify SSE subscribers without waiting on slow consumers
+        for queue in list(event_subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Drop the oldest event for this subscriber
+                queue.get_nowait()
+                queue.put_nowait(event)
 
         return event
 
@@ -75,15 +106,29 @@ async def append_event(event_data: EventCreate):
 
 
 @app.get("/ledger/session/{session_id}", response_model=list[Event])
-def get_session(session_id: str):
-    """Get all events for a session."""
+def get_session(
+    session_id: str,
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=0),
+    after: Optional[str] = Query(None, description="Only return events after this event ID")
+):
+    """Get events for a session, optionally paginated or after a cursor."""
+    end = offset + limit if limit is not None else None
     try:
-        events = storage.get_session_events(session_id)
-        return events
+        if after is not None:
+            events = storage.get_session_events_after(session_id, after)
+        else:
+            events = storage.get_session_events(session_id, start=offset, end=end)
     except Exception as e:
         logger.error("get_session_failed", session_id=session_id, error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
+    if events is None:
+        raise HTTPException(status_code=404, detail=f"Event {after} not found in session {session_id}")
+    if after is not None:
+        events = events[offset:end]
+    return events
+
 
 @app.get("/ledger/events")
 def get_events(start: Optional[str] = None, end: Optional[str] = None):
@@ -102,10 +147,15 @@ def get_events(start: Optional[str] = None, end: Optional[str] = None):
 
 
 @app.get("/ledger/sessions")
-def list_sessions():
-    """List all session IDs."""
+def list_sessions(request: Request, response: Response):
+    """List all session IDs; answers 304 if nothing was appended since the given ETag."""
+    # Read the ETag first so appends racing this request bump it for next time
+    etag = storage.etag()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
     try:
         sessions = storage.list_sessions()
+        response.headers["ETag"] = etag
         return {"sessions": sessions, "count": len(sessions)}
     except Exception as e:
         logger.error("list_sessions_failed", error=str(e))
@@ -116,8 +166,8 @@ def list_sessions():
 async def stream_events(session_id: Optional[str] = None):
     """Server-Sent Events endpoint for real-time updates."""
     async def event_generator():
-        queue = asyncio.Queue()
-        event_subscribers.append(queue)
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        event_subscribers.add(queue)
 
         try:
             while True:
@@ -131,8 +181,8 @@ async def stream_events(session_id: Optional[str] = None):
                     "event": "new_event",
                     "data": event.model_dump_json()
                 }
-        except asyncio.CancelledError:
-            event_subscribers.remove(queue)
+        finally:
+            event_subscribers.discard(queue)
 
     return EventSourceResponse(event_generator())
 
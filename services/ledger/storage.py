@@ -1,14 +1,51 @@
 """Storage layer for ledger service."""
+import atexit
+import mmap
+import os
+import queue
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import closing
 from pathlib import Path
-import json
 from datetime import datetime
 from typing import Optional
+import msgspec
+import orjson
 import structlog
 
 from .models import Event
 
 logger = structlog.get_logger()
 
+# Shared encoder - avoids per-event Pydantic JSON serialization
+_encoder = msgspec.json.Encoder()
+
+# Upper bound on append handles kept open across requests
+MAX_OPEN_FILES = 256
+
+# Most queued appends written by the writer thread in one batch
+MAX_WRITE_BATCH = 32
+
+# Timestamp index: byte offset of every event line, by ts
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events_idx (ts TEXT, session_id TEXT, offset INTEGER);
+CREATE INDEX IF NOT EXISTS events_idx_ts ON events_idx(ts);
+CREATE INDEX IF NOT EXISTS events_idx_session ON events_idx(session_id, offset);
+"""
+
+# Top-level "ts" of a raw event line. Event serializes ts before text and
+# metadata, so the first match is never a nested or quoted one.
+_TS_PATTERN = re.compile(rb'"ts":\s*"([^"]+)"')
+
+
+def _event_from_record(record: dict) -> Event:
+    """Build an Event from a ledger record, which was validated at write time."""
+    record["ts"] = datetime.fromisoformat(record["ts"])
+    return Event.model_construct(**record)
+
 
 class LedgerStorage:
     """Manages JSONL storage with optional SQLite index."""
@@ -16,71 +53,348 @@ class LedgerStorage:
     def __init__(self, data_dir: Path):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
+
+        # Long-lived append handles per session, least recently used first
+        self._files: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Bumped after every written batch; the random part changes per
+        # process so a restart never repeats an old ETag
+        self._generation = 0
+        self._instance_id = os.urandom(4).hex()
+
+        # Only the writer thread uses this connection once started
+        self.index_path = self.data_dir / "index.db"
+        self._index = sqlite3.connect(self.index_path, check_same_thread=False)
+        # WAL with NORMAL sync keeps the per-batch commit off the fsync path;
+        # a lost tail after a crash is rebuilt from the JSONL files at startup
+        self._index.execute("PRAGMA journal_mode=WAL")
+        self._index.execute("PRAGMA synchronous=NORMAL")
+        self._index.executescript(INDEX_SCHEMA)
+
+        # Sessions whose index rows are incomplete after a failed insert; kept
+        # on disk so a restart still rebuilds them
+        self._stale_path = self.data_dir / "index.stale"
+        self._stale_sessions: set[str] = set()
+        if self._stale_path.exists():
+            self._stale_sessions.update(self._stale_path.read_text().split())
+        self._reindex()
+        self._repair_index()
+
+        # Appends are group-committed by a single writer thread
+        self._queue: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="ledger-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close_all)
+
         logger.info("ledger_storage_initialized", data_dir=str(self.data_dir))
 
     def append_event(self, event: Event) -> None:
         """Append event to session-specific JSONL file."""
-        file_path = self.data_dir / f"{event.session_id}.jsonl"
-
-        # Atomic append
-        with open(file_path, "a") as f:
-            f.write(event.model_dump_json() + "\n")
-            f.flush()
-
-        logger.info(
-            "event_appended",
-            event_id=event.event_id,
-            session_id=event.session_id,
-            file=str(file_path)
+        self.submit_event(event).result()
+
+    def submit_event(self, event: Event) -> Future:
+        """Queue event for appending; the future resolves once it is written."""
+        future = Future()
+        self._queue.put((event, _encoder.encode(dict(event)) + b"\n", future))
+        return future
+
+    def _write_loop(self) -> None:
+        """Drain queued appends in batches until close_all() sends None."""
+        while True:
+            batch = []
+            item = self._queue.get()
+            while item is not None:
+                # Drop appends whose caller already gave up (e.g. disconnected);
+                # the rest can no longer be cancelled once marked running
+                if item[2].set_running_or_notify_cancel():
+                    batch.append(item)
+                if len(batch) >= MAX_WRITE_BATCH:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if batch:
+                # This is the only writer thread, so no batch may end it
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    logger.error("append_batch_failed", error=str(e))
+                    for _, _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+            if item is None:
+                return
+
+    def _write_batch(self, batch: list) -> None:
+        """Write a batch of appends with one write per session file."""
+        by_session = {}
+        for event, line, future in batch:
+            by_session.setdefault(event.session_id, []).append((event, line, future))
+
+        index_rows = []
+        written = []
+        with self._lock:
+            for session_id, items in by_session.items():
+                file_path = self.data_dir / f"{session_id}.jsonl"
+                try:
+                    f = self._get_file(session_id, file_path)
+                    offset = f.tell()
+                    f.write(b"".join(line for _, line, _ in items))
+                    f.flush()
+                except Exception as e:
+                    logger.error("append_write_failed", session_id=session_id, error=str(e))
+                    for _, _, future in items:
+                        future.set_exception(e)
+                    continue
+
+                for event, line, _ in items:
+                    index_rows.append((event.ts.isoformat(), session_id, offset))
+                    offset += len(line)
+                written.append((session_id, file_path, items))
+
+        if written:
+            self._generation += 1
+
+        # One index transaction per batch
+        try:
+            with self._index:
+                self._index.executemany("INSERT INTO events_idx VALUES (?, ?, ?)", index_rows)
+        except sqlite3.Error as e:
+            # Events are on disk but the index now has a gap for these sessions;
+            # they are rebuilt from their files, and paginated reads scan the
+            # file until that succeeds
+            logger.error("index_update_failed", error=str(e))
+            self._stale_sessions.update(session_id for session_id, _, _ in written)
+            self._save_stale_sessions()
+        if self._stale_sessions:
+            self._repair_index()
+
+        for session_id, file_path, items in written:
+            for event, _, future in items:
+                future.set_result(None)
+                logger.info(
+                    "event_appended",
+                    event_id=event.event_id,
+                    session_id=session_id,
+                    file=str(file_path)
+                )
+
+    def _get_file(self, session_id: str, file_path: Path):
+        """Return the open append handle for a session. Caller holds the lock."""
+        f = self._files.get(session_id)
+        if f is not None:
+            self._files.move_to_end(session_id)
+            return f
+
+        if len(self._files) >= MAX_OPEN_FILES:
+            _, oldest = self._files.popitem(last=False)
+            oldest.close()
+
+        f = open(file_path, "ab", buffering=64 * 1024)
+        self._files[session_id] = f
+        return f
+
+    def etag(self) -> str:
+        """ETag that changes whenever any event is appended."""
+        return f'"{self._instance_id}-{self._generation}"'
+
+    def _scan_index_rows(self, session_id: str, file_path: Path, last_offset: Optional[int] = None) -> list[tuple]:
+        """Index rows for the lines of a session file after last_offset (all if None)."""
+        rows = []
+        with open(file_path, "rb") as f:
+            if last_offset is not None:
+                f.seek(last_offset)
+                f.readline()
+
+            # Pull ts straight from the raw bytes, no JSON decoding
+            offset = f.tell()
+            for line in f:
+                match = _TS_PATTERN.search(line)
+                if match:
+                    rows.append((match.group(1).decode(), session_id, offset))
+                offset += len(line)
+        return rows
+
+    def _reindex(self) -> None:
+        """Index event lines written after the last indexed offset of each session."""
+        rows = []
+        for file_path in self.data_dir.glob("*.jsonl"):
+            session_id = file_path.stem
+            (last_offset,) = self._index.execute(
+                "SELECT MAX(offset) FROM events_idx WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            rows.extend(self._scan_index_rows(session_id, file_path, last_offset))
+
+        with self._index:
+            self._index.executemany("INSERT INTO events_idx VALUES (?, ?, ?)", rows)
+        if rows:
+            logger.info("ledger_index_rebuilt", indexed=len(rows))
+
+    def _repair_index(self) -> None:
+        """Rebuild all index rows of stale sessions from their files."""
+        for session_id in list(self._stale_sessions):
+            file_path = self.data_dir / f"{session_id}.jsonl"
+            try:
+                rows = self._scan_index_rows(session_id, file_path) if file_path.exists() else []
+                with self._index:
+                    self._index.execute("DELETE FROM events_idx WHERE session_id = ?", (session_id,))
+                    self._index.executemany("INSERT INTO events_idx VALUES (?, ?, ?)", rows)
+            except (OSError, sqlite3.Error) as e:
+                logger.error("index_repair_failed", session_id=session_id, error=str(e))
+                continue
+            self._stale_sessions.discard(session_id)
+            logger.info("session_index_repaired", session_id=session_id, indexed=len(rows))
+        self._save_stale_sessions()
+
+    def _save_stale_sessions(self) -> None:
+        """Persist the stale session set, removing the file once it is empty."""
+        try:
+            if self._stale_sessions:
+                self._stale_path.write_text("\n".join(sorted(self._stale_sessions)))
+            else:
+                self._stale_path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.error("index_stale_save_failed", error=str(e))
+
+    def close_all(self) -> None:
+        """Write any queued appends, then flush and close all open handles."""
+        if self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+
+        with self._lock:
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+        self._index.close()
+
+    def _query_index(self, query: str, params: tuple | list) -> list[tuple]:
+        """Run a read query on a separate connection; the shared one belongs to the writer thread."""
+        with closing(sqlite3.connect(self.index_path)) as conn:
+            return conn.execute(query, params).fetchall()
+
+    def _event_offset(self, session_id: str, position: int) -> Optional[int]:
+        """Byte offset of the event at a position in a session file, if any."""
+        rows = self._query_index(
+            "SELECT offset FROM events_idx WHERE session_id = ? ORDER BY offset LIMIT 1 OFFSET ?",
+            (session_id, position)
         )
+        return rows[0][0] if rows else None
 
-    def get_session_events(self, session_id: str) -> list[Event]:
-        """Read all events for a session."""
+    def get_session_events(self, session_id: str, start: int = 0, end: Optional[int] = None) -> list[Event]:
+        """Read events for a session, optionally only positions [start, end)."""
         file_path = self.data_dir / f"{session_id}.jsonl"
         if not file_path.exists():
             logger.debug("session_not_found", session_id=session_id)
             return []
 
+        if start == 0 and end is None:
+            with open(file_path, "rb") as f:
+                lines = f.readlines()
+        elif session_id in self._stale_sessions:
+            # Index has a gap for this session; slice a full scan instead
+            with open(file_path, "rb") as f:
+                lines = f.readlines()[start:end]
+        else:
+            # Look up the byte range in the index and read just that slice
+            first = self._event_offset(session_id, start)
+            stop = self._event_offset(session_id, end) if end is not None else None
+            if first is None or (end is not None and end <= start):
+                return []
+
+            with open(file_path, "rb") as f:
+                f.seek(first)
+                lines = (f.read(stop - first) if stop is not None else f.read()).splitlines()
+
+        return self._decode_lines(session_id, lines, start + 1)
+
+    def get_session_events_after(self, session_id: str, event_id: str) -> Optional[list[Event]]:
+        """Read events appended after event_id, or None if it is not in the session."""
+        file_path = self.data_dir / f"{session_id}.jsonl"
+        if not file_path.exists():
+            return None
+
+        # Find the cursor line in the raw bytes; it is usually near the end.
+        # The ID may also appear inside a later event's text or metadata, so
+        # only decode candidate lines and accept a top-level event_id match.
+        needle = b'"event_id":"' + event_id.encode() + b'"'
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = len(mm)
+                while True:
+                    pos = mm.rfind(needle, 0, end)
+                    if pos == -1:
+                        return None
+                    line_start = mm.rfind(b"\n", 0, pos) + 1
+                    line_end = mm.find(b"\n", pos)
+                    line = mm[line_start:line_end if line_end != -1 else len(mm)]
+                    try:
+                        if orjson.loads(line).get("event_id") == event_id:
+                            break
+                    except (orjson.JSONDecodeError, AttributeError):
+                        pass
+                    end = line_start
+                tail = mm[line_end + 1:] if line_end != -1 else b""
+
+        return self._decode_lines(session_id, tail.splitlines())
+
+    def _decode_lines(self, session_id: str, lines: list[bytes], first_line_num: Optional[int] = None) -> list[Event]:
+        """Decode raw event lines, skipping any that are not valid JSON."""
         events = []
-        with open(file_path, "r") as f:
-            for line_num, line in enumerate(f, 1):
-                try:
-                    events.append(Event(**json.loads(line)))
-                except json.JSONDecodeError as e:
-                    logger.warning(
-                        "invalid_jsonl_line",
-                        session_id=session_id,
-                        line_num=line_num,
-                        error=str(e)
-                    )
-                    continue
+        for i, line in enumerate(lines):
+            try:
+                events.append(_event_from_record(orjson.loads(line)))
+            except orjson.JSONDecodeError as e:
+                logger.warning(
+                    "invalid_jsonl_line",
+                    session_id=session_id,
+                    line_num=first_line_num + i if first_line_num is not None else None,
+                    error=str(e)
+                )
+                continue
 
         logger.info("session_events_loaded", session_id=session_id, count=len(events))
         return events
 
     def get_events_range(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> list[Event]:
         """Get all events within a time range."""
-        all_events = []
-
-        # Read all session files
-        for file_path in self.data_dir.glob("*.jsonl"):
-            with open(file_path, "r") as f:
-                for line in f:
-                    try:
-                        event = Event(**json.loads(line))
+        # ISO-8601 timestamps sort lexicographically, so compare them as strings
+        query = "SELECT session_id, offset FROM events_idx"
+        clauses = []
+        params = []
+        if start:
+            clauses.append("ts >= ?")
+            params.append(start.isoformat())
+        if end:
+            clauses.append("ts <= ?")
+            params.append(end.isoformat())
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY ts"
 
-                        # Filter by timestamp
-                        if start and event.ts < start:
-                            continue
-                        if end and event.ts > end:
-                            continue
+        rows = self._query_index(query, params)
 
-                        all_events.append(event)
-                    except (json.JSONDecodeError, ValueError):
-                        continue
+        all_events = []
+        files = {}
+        try:
+            for session_id, offset in rows:
+                f = files.get(session_id)
+                if f is None:
+                    f = files[session_id] = open(self.data_dir / f"{session_id}.jsonl", "rb")
+                f.seek(offset)
+                try:
+                    all_events.append(_event_from_record(orjson.loads(f.readline())))
+                except (orjson.JSONDecodeError, KeyError, TypeError, ValueError):
+                    continue
+        finally:
+            for f in files.values():
+                f.close()
 
-        # Sort by timestamp
-        all_events.sort(key=lambda e: e.ts)
         logger.info("events_range_loaded", count=len(all_events))
         return all_events
 
@@ -1,6 +1,10 @@
 """Contradiction detection logic."""
+import heapq
 import uuid
+from bisect import bisect_right
 from collections import defaultdict
+from operator import itemgetter
+from typing import Iterable
 import structlog
 
 from .models import Claim, Conflict
@@ -16,35 +20,124 @@ SCOPE_LEVELS = {
     "file": 4,
 }
 
+# Modality pairs that contradict each other
+OPPOSITES = [
+    ("must", "must_not"),
+    ("must", "avoid"),
+    ("should", "must_not"),
+    ("prefer", "avoid"),
+]
+
+# Integer encoding of modalities, so they can index lists and bitmaps
+MODALITY_IDS = {
+    "must": 0,
+    "must_not": 1,
+    "should": 2,
+    "prefer": 3,
+    "avoid": 4,
+    "allowed": 5,
+}
+OPPOSITE_IDS = [(MODALITY_IDS[a], MODALITY_IDS[b]) for a, b in OPPOSITES]
+
+# For each modality id, the ids it contradicts
+OPPOSING_IDS = [
+    [b for a, b in OPPOSITE_IDS if a == m] + [a for a, b in OPPOSITE_IDS if b == m]
+    for m in range(len(MODALITY_IDS))
+]
+
+_position = itemgetter(0)
+
+
+def _build_contradiction_masks() -> int:
+    """Bitmap over all 64 modality sets: bit m is set if set m holds an opposing pair."""
+    bitmap = 0
+    for mask in range(1 << len(MODALITY_IDS)):
+        if any(mask >> a & 1 and mask >> b & 1 for a, b in OPPOSITE_IDS):
+            bitmap |= 1 << mask
+    return bitmap
+
+
+CONTRADICTION_MASKS = _build_contradiction_masks()
+
+
+class ClaimColumns:
+    """Claims plus the fields detection reads, as parallel lists.
+
+    Each claim's group key, modality id and condition tokens are derived once
+    when it is added, not on every detection run over the session.
+    """
+
+    __slots__ = ("claims", "keys", "modality_ids", "tokens")
+
+    def __init__(self, claims: Iterable[Claim] = ()):
+        self.claims: list[Claim] = []
+        self.keys: list[tuple[str, str]] = []
+        self.modality_ids: list[int] = []
+        self.tokens: list[frozenset[str]] = []
+        self.extend(claims)
+
+    def extend(self, claims: Iterable[Claim]) -> None:
+        # Derive every column first so a bad claim leaves the lists aligned
+        claims = list(claims)
+        keys = [(claim.action, claim.target) for claim in claims]
+        modality_ids = [MODALITY_IDS[claim.modality] for claim in claims]
+        tokens = [condition_tokens(claim) for claim in claims]
+
+        self.claims.extend(claims)
+        self.keys.extend(keys)
+        self.modality_ids.extend(modality_ids)
+        self.tokens.extend(tokens)
 
-def detect_conflicts(claims: list[Claim]) -> list[Conflict]:
+    def __len__(self) -> int:
+        return len(self.claims)
+
+
+def detect_conflicts(claims: list[Claim] | ClaimColumns) -> list[Conflict]:
     """Detect contradictions between claims."""
     conflicts = []
+    columns = claims if isinstance(claims, ClaimColumns) else ClaimColumns(claims)
 
-    # Group by (action, target)
+    # Group claim indexes by (action, target), tracking the set of modalities per group
     groups = defaultdict(list)
-    for claim in claims:
-        key = (claim.action, claim.target)
-        groups[key].append(claim)
+    modality_masks = defaultdict(int)
+    for idx, (key, modality_id) in enumerate(zip(columns.keys, columns.modality_ids)):
+        groups[key].append(idx)
+        modality_masks[key] |= 1 << modality_id
 
     logger.debug("claims_grouped", group_count=len(groups))
 
     # Check for contradictions within each group
-    for (action, target), group_claims in groups.items():
-        if len(group_claims) < 2:
+    for (action, target), group_indexes in groups.items():
+        # Skip groups without an opposing modality pair
+        if not CONTRADICTION_MASKS >> modality_masks[(action, target)] & 1:
             continue
 
-        for i, claim1 in enumerate(group_claims):
-            for claim2 in group_claims[i+1:]:
-                # Check if modalities contradict
-                if not is_contradictory(claim1.modality, claim2.modality):
-                    continue
-
+        # Bucket by modality so only opposing buckets get paired
+        entries = []
+        buckets = [[] for _ in MODALITY_IDS]
+        for i, idx in enumerate(group_indexes):
+            modality_id = columns.modality_ids[idx]
+            entry = (i, modality_id, columns.claims[idx], columns.tokens[idx])
+            entries.append(entry)
+            buckets[modality_id].append(entry)
+
+        for i, modality_id, claim1, tokens1 in entries:
+            # Later claims in opposing buckets, in group order. Buckets are
+            # position-sorted, so this needs no pair list or sort.
+            later = [
+                buckets[m][bisect_right(buckets[m], i, key=_position):]
+                for m in OPPOSING_IDS[modality_id]
+            ]
+            if not later:
+                continue
+            opponents = later[0] if len(later) == 1 else heapq.merge(*later, key=_position)
+
+            for _, _, claim2, tokens2 in opponents:
                 # For now, skip scope overlap check (assume same session = overlap)
                 # In future: check claim scope fields
 
                 # Determine severity based on conditions
-                severity = assess_conflict_severity(claim1, claim2)
+                severity = assess_conflict_severity(claim1, claim2, tokens1, tokens2)
 
                 if severity != "none":
                     conflict = create_conflict(claim1, claim2, severity)
@@ -62,21 +155,24 @@ def detect_conflicts(claims: list[Claim]) -> list[Conflict]:
     return conflicts
 
 
-def is_contradictory(mod1: str, mod2: str) -> bool:
-    """Check if two modalities contradict each other."""
-    opposites = {
-        ('must', 'must_not'),
-        ('must', 'avoid'),
-        ('should', 'must_not'),
-        ('prefer', 'avoid'),
-    }
-    return (mod1, mod2) in opposites or (mod2, mod1) in opposites
+def condition_tokens(claim: Claim) -> frozenset[str]:
+    """Lowercase word set of a claim's conditions."""
+    if not claim.conditions:
+        return frozenset()
+    return frozenset(" ".join(claim.conditions).lower().split())
 
 
-def assess_conflict_severity(claim1: Claim, claim2: Claim) -> str:
+def assess_conflict_severity(
+    claim1: Claim,
+    claim2: Claim,
+    tokens1: frozenset[str],
+    tokens2: frozenset[str],
+) -> str:
     """
     Assess conflict severity: "hard" | "soft" | "none"
 
+    tokens1/tokens2 are the claims' precomputed condition_tokens().
+
     - hard: No conditions, always applies
     - soft: Conditional or exceptional cases
     - none: Conditions don't overlap
@@ -90,10 +186,7 @@ def assess_conflict_severity(claim1: Claim, claim2: Claim) -> str:
         return "soft"
 
     # Both have conditions - check for overlap
-    words1 = set(" ".join(claim1.conditions).lower().split())
-    words2 = set(" ".join(claim2.conditions).lower().split())
-
-    if words1 & words2:  # Intersection
+    if tokens1 & tokens2:  # Intersection
         return "soft"  # Conditionally conflicting
     else:
         return "none"  # Different conditions, no conflict
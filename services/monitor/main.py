@@ -1,16 +1,22 @@
 """Monitor service - Pipeline orchestration and conflict detection."""
 import os
-import json
 import asyncio
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
 from pathlib import Path
 from datetime import datetime
+from typing import Optional
 import structlog
 import httpx
+import orjson
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
 
 from .models import Claim, Conflict, ProcessingState, EventProcessingLog
-from .detector import detect_conflicts
+from .detector import MODALITY_IDS, ClaimColumns, detect_conflicts
 
 # Configure structured logging
 structlog.configure(
@@ -23,10 +29,63 @@ structlog.configure(
 
 logger = structlog.get_logger()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the shared HTTP client and start polling; clean up on shutdown."""
+    load_processed_events()
+    load_session_cursors()
+
+    # Let tasks that finish without blocking skip the scheduling hop (3.12+)
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+
+    # One pooled client for all ledger and extractor calls
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=httpx.Timeout(30.0, connect=5.0)
+    )
+    # http2=True only applies over TLS; plain http:// needs prior knowledge,
+    # which the extractor's server must accept (uvicorn does not, hypercorn does)
+    if EXTRACTOR_H2C:
+        app.state.extractor_http = httpx.AsyncClient(
+            http1=False,
+            http2=True,
+            timeout=httpx.Timeout(30.0, connect=5.0)
+        )
+    else:
+        app.state.extractor_http = app.state.http
+
+    # Start the processing log writer and polling in background
+    log_writer_task = asyncio.create_task(processing_log_writer())
+    poll_task = asyncio.create_task(poll_ledger(app.state.http, app.state.extractor_http))
+    logger.info("monitor_service_started")
+
+    yield
+
+    for task in (poll_task, log_writer_task):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            # A task that already died must not skip the cleanup below
+            logger.error("background_task_failed", task=task.get_coro().__name__, error=str(e))
+    flush_processing_log()
+    await app.state.http.aclose()
+    if app.state.extractor_http is not app.state.http:
+        await app.state.extractor_http.aclose()
+    await checkpoint_processed_events()
+    disk_executor.shutdown(wait=True)
+
+
 app = FastAPI(
     title="Prompt Analyzer - Monitor Service",
     description="Pipeline orchestration and conflict detection",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Configuration
@@ -34,6 +93,11 @@ LEDGER_URL = os.getenv("LEDGER_URL", "http://ledger:8000")
 EXTRACTOR_URL = os.getenv("EXTRACTOR_URL", "http://extractor:8000")
 DATA_DIR = Path(os.getenv("DATA_DIR", "/data"))
 POLL_INTERVAL = int(os.getenv("POLL_INTERVAL", "5"))
+MAX_CONCURRENT_EVENTS = int(os.getenv("MAX_CONCURRENT_EVENTS", "16"))
+MONITOR_FSYNC = os.getenv("MONITOR_FSYNC", "0") == "1"
+MONITOR_CRASH_RECOVERY = os.getenv("MONITOR_CRASH_RECOVERY", "0") == "1"
+CHECKPOINT_EVERY = int(os.getenv("CHECKPOINT_EVERY", "10000"))
+EXTRACTOR_H2C = os.getenv("EXTRACTOR_H2C", "0") == "1"
 
 # Data directories
 CLAIMS_DIR = DATA_DIR / "claims"
@@ -48,37 +112,196 @@ STATE_DIR.mkdir(parents=True, exist_ok=True)
 # Processing state
 processed_events = set()
 processing_log_path = STATE_DIR / "processing_log.jsonl"
+snapshot_path = STATE_DIR / "processed.snapshot"
+LOG_READ_CHUNK = 1 << 20
+# Processing log entries are batched into one write per window
+LOG_BATCH_SIZE = 64
+LOG_BATCH_WINDOW = 0.05
+processing_log_queue: asyncio.Queue = asyncio.Queue()
+
+# Writes with more items than this go to the disk executor instead of
+# blocking the event loop; kept apart from the default executor
+LARGE_WRITE_THRESHOLD = 32
+disk_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="monitor-disk")
+# Session fetches allowed to run ahead of the one being consumed
+SESSION_PREFETCH = 4
+# When this process last completed an event, in ns since the epoch
+last_processed_ns: Optional[int] = None
+# Size of processed_events at the last checkpoint
+checkpointed_count = 0
+# Per session, the last event ID such that it and all earlier events are processed
+session_cursors_path = STATE_DIR / "cursors.json"
+session_cursors: dict[str, str] = {}
+# ETag of the last fully processed sessions listing
+sessions_etag: Optional[str] = None
+
+# Caps in-flight extractor calls
+event_semaphore = asyncio.Semaphore(MAX_CONCURRENT_EVENTS)
+# Serializes claim and conflict updates within a session
+session_locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+# In-memory claims per session; the JSONL files are only read on first touch
+session_claims: dict[str, ClaimColumns] = {}
+# Latest conflicts per session, mirroring the conflicts files for reads
+session_conflicts: dict[str, list[Conflict]] = {}
+
+
+# Compiled once; dump_json goes straight to bytes without an intermediate dict
+_CLAIM_JSON = TypeAdapter(Claim)
+_CONFLICT_JSON = TypeAdapter(Conflict)
+_LOG_JSON = TypeAdapter(EventProcessingLog)
+
+
+def _dump_lines(adapter: TypeAdapter, items: list) -> bytes:
+    """Serialize items to JSON lines."""
+    return b"".join(adapter.dump_json(item) + b"\n" for item in items)
+
+
+def _read_lines(file_path: Path) -> list[bytes]:
+    """Read a whole file in one call and split it into lines."""
+    return file_path.read_bytes().split(b"\n")
+
+
+def _iter_lines_chunked(file_path: Path, chunk_size: int = LOG_READ_CHUNK):
+    """Yield lines of a possibly large file, reading it in fixed-size chunks."""
+    with open(file_path, "rb") as f:
+        fragments = []
+        while chunk := f.read(chunk_size):
+            lines = chunk.split(b"\n")
+            if len(lines) == 1:
+                fragments.append(chunk)
+                continue
+            fragments.append(lines[0])
+            yield b"".join(fragments)
+            yield from lines[1:-1]
+            fragments = [lines[-1]]
+        yield b"".join(fragments)
 
 
 def load_processed_events():
-    """Load list of already processed events."""
-    global processed_events
+    """Load processed events from the snapshot plus the log tail written since."""
+    global processed_events, checkpointed_count
+    if snapshot_path.exists():
+        with open(snapshot_path, "rb") as f:
+            processed_events.update(orjson.loads(f.read()))
+        checkpointed_count = len(processed_events)
     if processing_log_path.exists():
-        with open(processing_log_path, "r") as f:
-            for line in f:
-                try:
-                    log = EventProcessingLog(**json.loads(line))
-                    if log.state == ProcessingState.COMPLETED:
-                        processed_events.add(log.event_id)
-                except (json.JSONDecodeError, ValueError):
-                    continue
+        completed = ProcessingState.COMPLETED.value
+        for line in _iter_lines_chunked(processing_log_path):
+            if not line:
+                continue
+            try:
+                # Only two fields matter here, so skip building the model
+                entry = orjson.loads(line)
+                if entry["state"] == completed:
+                    processed_events.add(entry["event_id"])
+            except (orjson.JSONDecodeError, KeyError, TypeError):
+                continue
     logger.info("processed_events_loaded", count=len(processed_events))
 
 
-def log_processing_state(log: EventProcessingLog):
-    """Append processing state to log."""
-    with open(processing_log_path, "a") as f:
-        f.write(log.model_dump_json() + "\n")
+def write_processed_snapshot(event_ids: list[str]):
+    """Write a processed-events snapshot and truncate the processing log."""
+    tmp_path = snapshot_path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(sorted(event_ids)))
         f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, snapshot_path)
+    # Every COMPLETED entry is now in the snapshot; a crash before this
+    # truncate only means replaying entries that are already known
+    open(processing_log_path, "wb").close()
+
+
+async def checkpoint_processed_events():
+    """Snapshot processed events on the disk executor."""
+    global checkpointed_count
+    # Copy on the loop so the snapshot sees a consistent set
+    event_ids = list(processed_events)
+    await asyncio.get_running_loop().run_in_executor(
+        disk_executor, write_processed_snapshot, event_ids
+    )
+    checkpointed_count = len(event_ids)
+    logger.info("processed_events_checkpointed", count=checkpointed_count)
+
+
+def load_session_cursors():
+    """Load per-session ledger cursors."""
+    if session_cursors_path.exists():
+        with open(session_cursors_path, "rb") as f:
+            session_cursors.update(orjson.loads(f.read()))
+    logger.info("session_cursors_loaded", count=len(session_cursors))
+
+
+def save_session_cursors():
+    """Persist per-session ledger cursors atomically."""
+    tmp_path = session_cursors_path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(orjson.dumps(session_cursors))
+    os.replace(tmp_path, session_cursors_path)
+
+
+def log_processing_state(log: EventProcessingLog):
+    """Queue processing state for the log writer."""
+    processing_log_queue.put_nowait(log)
+
+
+def write_processing_log(entries: list[EventProcessingLog]):
+    """Append processing state entries to the log in one write."""
+    try:
+        with open(processing_log_path, "ab") as f:
+            f.write(_dump_lines(_LOG_JSON, entries))
+            # Completions are what recovery relies on; fsync them if asked to
+            if MONITOR_FSYNC and any(log.state == ProcessingState.COMPLETED for log in entries):
+                f.flush()
+                os.fsync(f.fileno())
+    except OSError as e:
+        # Keep the writer draining the queue; these events are already in
+        # processed_events and will be in the next snapshot
+        logger.error("processing_log_write_failed", count=len(entries), error=str(e))
+
+
+async def run_disk_write(write, size: int):
+    """Run a write inline, or on the disk executor if it covers many items."""
+    if size > LARGE_WRITE_THRESHOLD:
+        await asyncio.get_running_loop().run_in_executor(disk_executor, write)
+    else:
+        write()
+
+
+async def processing_log_writer():
+    """Drain the processing log queue, batching entries into single writes."""
+    while True:
+        entries = [await processing_log_queue.get()]
+        try:
+            # Give concurrent events a moment to add to the batch
+            if processing_log_queue.qsize() < LOG_BATCH_SIZE - 1:
+                await asyncio.sleep(LOG_BATCH_WINDOW)
+            while len(entries) < LOG_BATCH_SIZE and not processing_log_queue.empty():
+                entries.append(processing_log_queue.get_nowait())
+        except asyncio.CancelledError:
+            write_processing_log(entries)
+            raise
+        try:
+            await run_disk_write(partial(write_processing_log, entries), len(entries))
+        except Exception as e:
+            # e.g. the executor itself failing; the writer must keep running
+            logger.error("processing_log_write_failed", count=len(entries), error=str(e))
+
+
+def flush_processing_log():
+    """Write any processing log entries still queued."""
+    entries = []
+    while not processing_log_queue.empty():
+        entries.append(processing_log_queue.get_nowait())
+    if entries:
+        write_processing_log(entries)
 
 
 def save_claims(session_id: str, claims: list[Claim]):
     """Save claims to session-specific JSONL file."""
     file_path = CLAIMS_DIR / f"{session_id}.jsonl"
-    with open(file_path, "a") as f:
-        for claim in claims:
-            f.write(claim.model_dump_json() + "\n")
-        f.flush()
+    with open(file_path, "ab") as f:
+        f.write(_dump_lines(_CLAIM_JSON, claims))
     logger.info("claims_saved", session_id=session_id, count=len(claims))
 
 
@@ -89,24 +312,34 @@ def load_claims(session_id: str) -> list[Claim]:
         return []
 
     claims = []
-    with open(file_path, "r") as f:
-        for line in f:
-            try:
-                claims.append(Claim(**json.loads(line)))
-            except (json.JSONDecodeError, ValueError):
-                continue
+    for line in _read_lines(file_path):
+        if not line:
+            continue
+        try:
+            claims.append(Claim.model_construct(**orjson.loads(line)))
+        except (orjson.JSONDecodeError, TypeError):
+            continue
 
     logger.info("claims_loaded", session_id=session_id, count=len(claims))
     return claims
 
 
-def save_conflicts(session_id: str, conflicts: list[Conflict]):
-    """Save conflicts to session-specific JSONL file."""
+def save_conflicts(session_id: str, conflicts: list[Conflict], replace: bool = False):
+    """Save conflicts to session-specific JSONL file.
+
+    With replace=True the file is rewritten atomically via a temp file.
+    """
     file_path = CONFLICTS_DIR / f"{session_id}.jsonl"
-    with open(file_path, "a") as f:
-        for conflict in conflicts:
-            f.write(conflict.model_dump_json() + "\n")
-        f.flush()
+    if replace:
+        tmp_path = file_path.with_suffix(".jsonl.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(_dump_lines(_CONFLICT_JSON, conflicts))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    else:
+        with open(file_path, "ab") as f:
+            f.write(_dump_lines(_CONFLICT_JSON, conflicts))
     logger.info("conflicts_saved", session_id=session_id, count=len(conflicts))
 
 
@@ -117,19 +350,37 @@ def load_conflicts(session_id: str) -> list[Conflict]:
         return []
 
     conflicts = []
-    with open(file_path, "r") as f:
-        for line in f:
-            try:
-                conflicts.append(Conflict(**json.loads(line)))
-            except (json.JSONDecodeError, ValueError):
-                continue
+    for line in _read_lines(file_path):
+        if not line:
+            continue
+        try:
+            conflicts.append(Conflict.model_construct(**orjson.loads(line)))
+        except (orjson.JSONDecodeError, TypeError):
+            continue
 
     logger.info("conflicts_loaded", session_id=session_id, count=len(conflicts))
     return conflicts
 
 
+def get_session_claims(session_id: str) -> ClaimColumns:
+    """Return the cached claims for a session, loading them from disk once."""
+    if session_id not in session_claims:
+        session_claims[session_id] = ClaimColumns(load_claims(session_id))
+    return session_claims[session_id]
+
+
+def get_session_conflicts(session_id: str) -> list[Conflict]:
+    """Return the cached conflicts for a session, loading them from disk once."""
+    conflicts = session_conflicts.get(session_id)
+    if conflicts is None:
+        # setdefault keeps a newer list stored by process_event meanwhile
+        conflicts = session_conflicts.setdefault(session_id, load_conflicts(session_id))
+    return conflicts
+
+
 async def process_event(event: dict, client: httpx.AsyncClient):
     """Process a single event: extract claims and detect conflicts."""
+    global last_processed_ns
     event_id = event["event_id"]
     session_id = event["session_id"]
 
@@ -138,14 +389,15 @@ async def process_event(event: dict, client: httpx.AsyncClient):
         logger.debug("event_already_processed", event_id=event_id)
         return
 
-    # Log processing start
-    log_processing_state(EventProcessingLog(
-        event_id=event_id,
-        session_id=session_id,
-        state=ProcessingState.PROCESSING,
-        attempts=1,
-        timestamp=datetime.now()
-    ))
+    # Log processing start. Only COMPLETED entries are read back at startup;
+    # PROCESSING ones just show which events were in flight when the service died
+    if MONITOR_CRASH_RECOVERY:
+        log_processing_state(EventProcessingLog(
+            event_id=event_id,
+            session_id=session_id,
+            state=ProcessingState.PROCESSING,
+            attempts=1
+        ))
 
     try:
         # Extract claims
@@ -160,40 +412,50 @@ async def process_event(event: dict, client: httpx.AsyncClient):
             timeout=30.0
         )
         extract_response.raise_for_status()
-        extraction_result = extract_response.json()
-
-        claims = [Claim(**c) for c in extraction_result["claims"]]
+        extraction_result = orjson.loads(extract_response.content)
+
+        # The extractor validates claims against the same schema before responding;
+        # still reject unknown modalities, which detection cannot index
+        claims = []
+        for c in extraction_result["claims"]:
+            if c.get("modality") not in MODALITY_IDS:
+                logger.warning("claim_rejected", event_id=event_id, modality=c.get("modality"))
+                continue
+            claims.append(Claim.model_construct(**c))
 
-        # Save claims
-        if claims:
-            save_claims(session_id, claims)
+        async with session_locks[session_id]:
+            # Load cached claims before saving so new ones aren't read back twice
+            all_claims = get_session_claims(session_id)
 
-        # Load all claims for session
-        all_claims = load_claims(session_id)
+            # Save claims
+            if claims:
+                await run_disk_write(partial(save_claims, session_id, claims), len(claims))
+                all_claims.extend(claims)
 
-        # Detect conflicts
-        logger.info("detecting_conflicts", session_id=session_id)
-        conflicts = detect_conflicts(all_claims)
+            # Detect conflicts
+            logger.info("detecting_conflicts", session_id=session_id)
+            conflicts = detect_conflicts(all_claims)
 
-        # Save new conflicts (simple approach: overwrite for now)
-        if conflicts:
-            # Clear old conflicts file
-            conflict_file = CONFLICTS_DIR / f"{session_id}.jsonl"
-            if conflict_file.exists():
-                conflict_file.unlink()
-            save_conflicts(session_id, conflicts)
+            # Save new conflicts (simple approach: overwrite for now)
+            # Always off the loop: the atomic replace fsyncs
+            if conflicts:
+                await asyncio.get_running_loop().run_in_executor(
+                    disk_executor, partial(save_conflicts, session_id, conflicts, replace=True)
+                )
+                session_conflicts[session_id] = conflicts
 
         # Mark as completed
-        log_processing_state(EventProcessingLog(
+        completed = EventProcessingLog(
             event_id=event_id,
             session_id=session_id,
             state=ProcessingState.COMPLETED,
             attempts=1,
-            claims_extracted=len(claims),
-            timestamp=datetime.now()
-        ))
+            claims_extracted=len(claims)
+        )
+        log_processing_state(completed)
 
         processed_events.add(event_id)
+        last_processed_ns = completed.timestamp_ns
 
         logger.info(
             "event_processed",
@@ -209,46 +471,112 @@ async def process_event(event: dict, client: httpx.AsyncClient):
             session_id=session_id,
             state=ProcessingState.FAILED,
             attempts=1,
-            last_error=str(e),
-            timestamp=datetime.now()
+            last_error=str(e)
         ))
 
 
-async def poll_ledger():
-    """Poll ledger for new events and process them."""
-    logger.info("starting_ledger_poll", interval=POLL_INTERVAL)
-
-    async with httpx.AsyncClient() as client:
-        while True:
-            try:
-                # Get all sessions
-                sessions_response = await client.get(f"{LEDGER_URL}/ledger/sessions")
-                sessions_response.raise_for_status()
-                sessions = sessions_response.json()["sessions"]
-
-                # Process each session
-                for session_id in sessions:
-                    events_response = await client.get(f"{LEDGER_URL}/ledger/session/{session_id}")
-                    events_response.raise_for_status()
-                    events = events_response.json()
+async def process_event_bounded(event: dict, client: httpx.AsyncClient):
+    """Process an event once a concurrency slot is free."""
+    async with event_semaphore:
+        await process_event(event, client)
+
+
+async def fetch_session_events(session_id: str, client: httpx.AsyncClient) -> list[dict]:
+    """Fetch a session's ledger events after its cursor, or all of them if it has none."""
+    url = f"{LEDGER_URL}/ledger/session/{session_id}"
+    cursor = session_cursors.get(session_id)
+    if cursor is not None:
+        response = await client.get(url, params={"after": cursor})
+        if response.status_code != 404:
+            response.raise_for_status()
+            return response.json()
+        # The ledger no longer knows the cursor; fall back to a full read
+        logger.warning("session_cursor_not_found", session_id=session_id, cursor=cursor)
+    response = await client.get(url)
+    response.raise_for_status()
+    return response.json()
+
+
+async def poll_once(client: httpx.AsyncClient, extractor_client: httpx.AsyncClient):
+    """Fetch new events from the ledger and process them."""
+    global sessions_etag
+
+    # Get all sessions, unless nothing was appended since the last full pass
+    headers = {"If-None-Match": sessions_etag} if sessions_etag else {}
+    sessions_response = await client.get(f"{LEDGER_URL}/ledger/sessions", headers=headers)
+    if sessions_response.status_code == 304:
+        return
+    sessions_response.raise_for_status()
+    sessions = sessions_response.json()["sessions"]
 
-                    for event in events:
-                        await process_event(event, client)
+    # Pipeline: prefetch upcoming sessions while earlier ones are processed
+    fetches: asyncio.Queue = asyncio.Queue(maxsize=SESSION_PREFETCH)
 
-            except Exception as e:
-                logger.error("poll_failed", error=str(e))
+    async def produce():
+        for session_id in sessions:
+            await fetches.put(asyncio.create_task(fetch_session_events(session_id, client)))
 
-            # Wait before next poll
-            await asyncio.sleep(POLL_INTERVAL)
+    producer = asyncio.create_task(produce())
+    fetched, events, tasks = [], [], []
+    seen = processed_events
+    try:
+        for session_id in sessions:
+            session_events = await (await fetches.get())
+            fetched.append((session_id, session_events))
+            # Skip processed events here rather than paying for a task each
+            new_events = [e for e in session_events if e["event_id"] not in seen]
+            events.extend(new_events)
+            # Processing is bounded by the semaphore
+            tasks.extend(
+                asyncio.create_task(process_event_bounded(event, extractor_client))
+                for event in new_events
+            )
+    finally:
+        producer.cancel()
+        while not fetches.empty():
+            fetches.get_nowait().cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    for event, result in zip(events, results):
+        if isinstance(result, Exception):
+            logger.error("event_task_failed", event_id=event["event_id"], error=str(result))
+
+    # Advance cursors over each session's processed prefix so failures are retried
+    caught_up = True
+    cursors_moved = False
+    for session_id, session_events in fetched:
+        for event in session_events:
+            if event["event_id"] not in processed_events:
+                caught_up = False
+                break
+            session_cursors[session_id] = event["event_id"]
+            cursors_moved = True
+    if cursors_moved:
+        save_session_cursors()
+
+    # Only skip unchanged polls once there is nothing left to retry
+    sessions_etag = sessions_response.headers.get("etag") if caught_up else None
+
+    # No events are in flight here, so every COMPLETED entry in the log is
+    # covered by the snapshot. The log writer may still hold queued entries
+    # that land after the truncate; they are already in the snapshot, so
+    # replaying them at startup is harmless.
+    if len(processed_events) - checkpointed_count >= CHECKPOINT_EVERY:
+        await checkpoint_processed_events()
+
+
+async def poll_ledger(client: httpx.AsyncClient, extractor_client: httpx.AsyncClient):
+    """Poll ledger for new events and process them."""
+    logger.info("starting_ledger_poll", interval=POLL_INTERVAL)
 
+    while True:
+        try:
+            await poll_once(client, extractor_client)
+        except Exception as e:
+            logger.error("poll_failed", error=str(e))
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize on startup."""
-    load_processed_events()
-    # Start polling in background
-    asyncio.create_task(poll_ledger())
-    logger.info("monitor_service_started")
+        # Wait before next poll
+        await asyncio.sleep(POLL_INTERVAL)
 
 
 @app.get("/monitor/status")
@@ -257,6 +585,10 @@ def get_status():
     return {
         "status": "running",
         "processed_events": len(processed_events),
+        "last_processed_at": (
+            datetime.fromtimestamp(last_processed_ns / 1e9).isoformat()
+            if last_processed_ns is not None else None
+        ),
         "ledger_url": LEDGER_URL,
         "extractor_url": EXTRACTOR_URL,
         "poll_interval": POLL_INTERVAL
@@ -267,8 +599,7 @@ def get_status():
 def get_conflicts(session_id: str):
     """Get all conflicts for a session."""
     try:
-        conflicts = load_conflicts(session_id)
-        return conflicts
+        return get_session_conflicts(session_id)
     except Exception as e:
         logger.error("get_conflicts_failed", session_id=session_id, error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
@@ -304,4 +635,4 @@ def health():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools")
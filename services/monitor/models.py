@@ -1,5 +1,5 @@
 """Data models for monitor service."""
-from datetime import datetime
+import time
 from pydantic import BaseModel, Field
 from typing import Literal
 from enum import Enum
@@ -59,5 +59,5 @@ class EventProcessingLog(BaseModel):
     state: ProcessingState
     attempts: int = 0
     last_error: str | None = None
-    timestamp: datetime = Field(default_factory=datetime.now)
+    timestamp_ns: int = Field(default_factory=time.time_ns)
     claims_extracted: int = 0